@@ -1,12 +1,14 @@
 # backend/app.py
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict
 import uvicorn
 
 from model_loader import Big5ModelLoader
 from gemini_summarizer import GeminiPersonalitySummarizer
+from prediction_cache import PredictionCache, make_prediction_key
 
 app = FastAPI(title="Big Five Personality Prediction API")
 
@@ -31,6 +33,13 @@ model_loader = Big5ModelLoader(
 )
 summarizer = GeminiPersonalitySummarizer()
 
+# Coalesce identical concurrent /predict requests and briefly cache results
+prediction_cache = PredictionCache(
+    ttl_seconds=float(os.getenv('PREDICT_CACHE_TTL_SECONDS', '30')),
+    max_entries=int(os.getenv('PREDICT_CACHE_MAX_ENTRIES', '256')),
+    max_inflight=int(os.getenv('PREDICT_MAX_INFLIGHT', '64'))
+)
+
 # Request/Response models
 class PredictionRequest(BaseModel):
     comments: List[str]
@@ -50,39 +59,60 @@ class PredictionResponse(BaseModel):
 async def root():
     return {"message": "Big Five Personality Prediction API", "status": "running"}
 
+def run_prediction(comments: List[str], include_summary: bool) -> Dict:
+    """Run the model (and optional AI summary) for a list of comments"""
+    # Get predictions
+    scores = model_loader.predict(comments)
+    
+    # Get basic interpretations
+    interpretations = {}
+    for trait, data in scores.items():
+        interpretations[trait] = model_loader.get_trait_interpretation(
+            trait, data['score']
+        )
+    
+    # Generate AI summary if requested
+    summary = None
+    if include_summary:
+        try:
+            summary = summarizer.create_personality_summary(scores)
+        except Exception as e:
+            print(f"Error generating summary: {e}")
+            summary = {
+                'full_summary': 'AI summary temporarily unavailable',
+                'short_summary': 'Unable to generate summary at this time'
+            }
+    
+    return {
+        'scores': scores,
+        'interpretations': interpretations,
+        'summary': summary
+    }
+
 @app.post("/predict", response_model=PredictionResponse)
 async def predict_personality(request: PredictionRequest):
     """Predict Big Five personality traits from user comments"""
+    # Validate input
+    if not request.comments or len(request.comments) == 0:
+        raise HTTPException(status_code=400, detail="No comments provided")
+    
     try:
-        # Validate input
-        if not request.comments or len(request.comments) == 0:
-            raise HTTPException(status_code=400, detail="No comments provided")
-        
-        # Get predictions
-        scores = model_loader.predict(request.comments)
-        
-        # Get basic interpretations
-        interpretations = {}
-        for trait, data in scores.items():
-            interpretations[trait] = model_loader.get_trait_interpretation(
-                trait, data['score']
-            )
+        key = make_prediction_key(request.comments, request.include_summary)
+        result = await prediction_cache.get_or_compute(
+            key,
+            lambda: run_in_threadpool(run_prediction, request.comments, request.include_summary)
+        )
         
-        # Generate AI summary if requested
-        summary = None
-        if request.include_summary:
-            try:
-                summary = summarizer.create_personality_summary(scores)
-            except Exception as e:
-                print(f"Error generating summary: {e}")
-                summary = {
-                    'full_summary': 'AI summary temporarily unavailable',
-                    'short_summary': 'Unable to generate summary at this time'
-                }
+        # A cached fallback may have had its AI summary finish since
+        summary = result['summary']
+        if summary and 'summary_id' in summary:
+            pending = summarizer.get_pending_summary(summary['summary_id'])
+            if pending and pending['status'] == 'complete':
+                summary = {k: v for k, v in pending.items() if k != 'status'}
         
         return PredictionResponse(
-            scores=scores,
-            interpretations=interpretations,
+            scores=result['scores'],
+            interpretations=result['interpretations'],
             summary=summary,
             success=True
         )
@@ -90,11 +120,29 @@ async def predict_personality(request: PredictionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/predict/cache-stats")
+async def get_prediction_cache_stats():
+    """Coalescing and result cache counters for /predict"""
+    return prediction_cache.get_stats()
+
+@app.get("/summary/{summary_id}")
+async def get_summary(summary_id: str):
+    """Fetch an AI summary that finished after its /predict request returned"""
+    result = summarizer.get_pending_summary(summary_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown summary_id")
+    return result
+
+@app.get("/summary-status")
+async def get_summary_status():
+    """Circuit breaker state for the Gemini summarizer"""
+    return summarizer.breaker.get_state()
+
 @app.post("/trait-insight")
 async def get_trait_insight(trait: str, score: float):
     """Get detailed insights for a specific trait"""
     try:
-        insight = summarizer.get_trait_specific_insights(trait, score)
+        insight = await run_in_threadpool(summarizer.get_trait_specific_insights, trait, score)
         return {"trait": trait, "score": score, "insight": insight}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
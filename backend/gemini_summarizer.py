@@ -1,11 +1,106 @@
 # backend/gemini_summarizer.py - WORKING VERSION
 import google.generativeai as genai
-from typing import Dict
+from typing import Dict, Optional
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 
 load_dotenv()
 
+class CircuitBreaker:
+    """Stop calling a failing remote service and probe it again periodically.
+
+    closed: calls allowed. open: calls rejected until reset_timeout passes.
+    half_open: a single probe call is allowed; its outcome closes or re-opens.
+
+    allow_request() returns a ticket for the current circuit generation.
+    Only outcomes carrying the current ticket change state, so a slow call
+    admitted before the circuit opened can't close it or delay the probe.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self._generation = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> Optional[int]:
+        """Return a ticket if a call may go ahead, else None"""
+        with self._lock:
+            if self.state == 'closed':
+                return self._generation
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._generation += 1
+                self._probe_in_flight = False
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return self._generation
+            return None
+
+    def record_success(self, ticket: int):
+        with self._lock:
+            if ticket != self._generation or self.state == 'open':
+                return
+            if self.state == 'half_open':
+                self.state = 'closed'
+                self._generation += 1
+                self._probe_in_flight = False
+            self.failures = 0
+
+    def record_failure(self, ticket: int):
+        with self._lock:
+            self.failures += 1
+            if ticket != self._generation or self.state == 'open':
+                return
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self._trip_locked()
+
+    def release(self, ticket: int):
+        """Give back a ticket whose call never ran (e.g. cancelled while queued)"""
+        with self._lock:
+            if ticket == self._generation and self.state == 'half_open':
+                self._probe_in_flight = False
+
+    def trip(self):
+        """Open the circuit immediately"""
+        with self._lock:
+            self._trip_locked()
+
+    def _trip_locked(self):
+        if self.state != 'open':
+            print(f"⚠ Gemini circuit opened; retrying in {self.reset_timeout:g}s")
+        self.state = 'open'
+        self.opened_at = time.monotonic()
+        self._generation += 1
+        self._probe_in_flight = False
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected (does not start a probe)"""
+        with self._lock:
+            return self.state == 'open'
+
+    def get_state(self) -> Dict:
+        """Effective state; an open circuit past reset_timeout reports half_open"""
+        with self._lock:
+            state = {'state': self.state, 'failures': self.failures}
+            if self.state == 'open':
+                retry_in = self.reset_timeout - (time.monotonic() - self.opened_at)
+                if retry_in <= 0:
+                    state['state'] = 'half_open'
+                else:
+                    state['retry_in_seconds'] = round(retry_in, 1)
+            return state
+
+
 class GeminiPersonalitySummarizer:
     def __init__(self):
         """Initialize Gemini API"""
@@ -16,6 +111,31 @@ class GeminiPersonalitySummarizer:
         
         genai.configure(api_key=api_key)
         
+        # Latency budget for AI calls; past it the rule-based fallback is returned
+        self.summary_timeout = float(os.getenv('SUMMARY_TIMEOUT_SECONDS', '8'))
+        self.insight_timeout = float(os.getenv('INSIGHT_TIMEOUT_SECONDS', '5'))
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv('GEMINI_BREAKER_FAILURE_THRESHOLD', '3')),
+            reset_timeout=float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', '30'))
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('GEMINI_MAX_WORKERS', '4')),
+            thread_name_prefix='gemini'
+        )
+        # AI summaries that finished after their request's deadline
+        self._pending_summaries: "OrderedDict[str, Future]" = OrderedDict()
+        self._max_pending_summaries = int(os.getenv('PENDING_SUMMARY_MAX_ENTRIES', '256'))
+        self._pending_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        
+        self.model = None
+        if not self._load_model(self.summary_timeout):
+            print("⚠ Running in fallback mode (basic summaries without AI)")
+            # Re-probe after the breaker's reset timeout instead of never
+            self.breaker.trip()
+    
+    def _load_model(self, timeout: float) -> bool:
+        """Try the known Gemini models in order; returns True once one works"""
         # List of models to try in order (October 2025 working models)
         models_to_try = [
             'gemini-1.5-flash',      # Current free tier model
@@ -27,29 +147,137 @@ class GeminiPersonalitySummarizer:
             'gemini-1.0-pro'
         ]
         
-        model_loaded = False
         last_error = None
         
         for model_name in models_to_try:
+            # Give up early if the caller's deadline already opened the circuit
+            if self.breaker.is_open():
+                break
             try:
-                self.model = genai.GenerativeModel(model_name)
+                model = genai.GenerativeModel(model_name)
                 # Test the model works
-                test_response = self.model.generate_content("Test")
+                test_response = model.generate_content(
+                    "Test", request_options={'timeout': timeout}
+                )
                 print(f"✓ Successfully loaded Gemini model: {model_name}")
-                model_loaded = True
-                break
+                self.model = model
+                return True
             except Exception as e:
                 last_error = e
                 print(f"⚠ Model {model_name} not available: {str(e)[:100]}")
                 continue
         
-        if not model_loaded:
-            print(f"❌ No Gemini models available. Last error: {last_error}")
-            print("⚠ Running in fallback mode (basic summaries without AI)")
-            self.model = None
+        print(f"❌ No Gemini models available. Last error: {last_error}")
+        return False
+    
+    def _get_model(self, timeout: float):
+        """Return the loaded model, retrying the load if startup failed"""
+        if self.model is not None:
+            return self.model
+        
+        # Don't pile worker threads up behind a slow load
+        if not self._model_lock.acquire(timeout=timeout):
+            raise RuntimeError("Gemini model is still loading")
+        try:
+            if self.model is None and not self._load_model(timeout):
+                raise RuntimeError("No Gemini models available")
+            return self.model
+        finally:
+            self._model_lock.release()
+    
+    def _generate(self, model, prompt: str, timeout: float) -> str:
+        """Single remote call; skipped if the circuit opened while queued"""
+        if self.breaker.is_open():
+            raise RuntimeError("Gemini circuit is open")
+        response = model.generate_content(prompt, request_options={'timeout': timeout})
+        return response.text
+    
+    def _call_with_deadline(self, func, timeout: float):
+        """Run func on the worker pool, guarded by the circuit breaker.
+
+        Returns (future, result). result is None if the breaker is open,
+        the call failed, or the deadline passed. A timed-out call that
+        has not started yet is cancelled; one that is already running is
+        returned so it can be inspected later.
+
+        The breaker judges the call by how long it ran once a worker
+        picked it up, so time spent queued behind other calls is not
+        blamed on Gemini.
+        """
+        ticket = self.breaker.allow_request()
+        if ticket is None:
+            return None, None
+        
+        job = {'started_at': None, 'settled': False}
+        job_lock = threading.Lock()
+        
+        def settle(ok: bool):
+            with job_lock:
+                if job['settled']:
+                    return
+                job['settled'] = True
+            if ok:
+                self.breaker.record_success(ticket)
+            else:
+                self.breaker.record_failure(ticket)
         
-    def create_personality_summary(self, scores: Dict[str, Dict]) -> Dict[str, str]:
-        """Generate comprehensive personality summary using Gemini"""
+        def run():
+            job['started_at'] = time.monotonic()
+            try:
+                result = func()
+            except Exception:
+                settle(False)
+                raise
+            settle(time.monotonic() - job['started_at'] <= timeout)
+            return result
+        
+        future = self._executor.submit(run)
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if future.cancel():
+                # Never reached a worker, so Gemini wasn't involved
+                print(f"⚠ Gemini call still queued after {timeout:.1f}s, using fallback")
+                self.breaker.release(ticket)
+                return None, None
+            print(f"⚠ Gemini call exceeded {timeout:.1f}s deadline, using fallback")
+            started_at = job['started_at']
+            if started_at is not None and time.monotonic() - started_at >= timeout:
+                settle(False)
+            return future, None
+        except Exception as e:
+            print(f"❌ Gemini call failed: {e}")
+            return None, None
+        
+        return None, result
+    
+    def _remember_pending(self, future) -> str:
+        summary_id = uuid.uuid4().hex
+        with self._pending_lock:
+            self._pending_summaries[summary_id] = future
+            while len(self._pending_summaries) > self._max_pending_summaries:
+                self._pending_summaries.popitem(last=False)
+        return summary_id
+    
+    def get_pending_summary(self, summary_id: str) -> Optional[Dict[str, str]]:
+        """Look up an AI summary that was still running when its request returned"""
+        with self._pending_lock:
+            future = self._pending_summaries.get(summary_id)
+        if future is None:
+            return None
+        if not future.done():
+            return {'status': 'pending'}
+        if future.exception() is not None:
+            return {'status': 'failed'}
+        return {'status': 'complete', **future.result()}
+    
+    def create_personality_summary(self, scores: Dict[str, Dict], timeout: Optional[float] = None) -> Dict[str, str]:
+        """Generate comprehensive personality summary using Gemini.
+
+        Falls back to the rule-based summary if the AI summary is not ready
+        within timeout seconds; the AI summary then completes in the
+        background and can be fetched via get_pending_summary(summary_id).
+        """
         
         # Prepare scores for prompt
         scores_text = "\n".join([
@@ -57,13 +285,27 @@ class GeminiPersonalitySummarizer:
             for trait, data in scores.items()
         ])
         
-        # If model not available, use fallback
-        if self.model is None:
-            return self._generate_fallback_summary(scores, scores_text)
+        if timeout is None:
+            timeout = self.summary_timeout
         
-        try:
-            # Create detailed prompt
-            prompt = f"""
+        future, summary = self._call_with_deadline(
+            lambda: self._generate_ai_summary(scores_text, timeout), timeout
+        )
+        if summary is not None:
+            return summary
+        
+        fallback = self._generate_fallback_summary(scores, scores_text)
+        if future is not None:
+            fallback['summary_id'] = self._remember_pending(future)
+            fallback['generated_at'] = 'Rule-based (AI summary pending)'
+        return fallback
+    
+    def _generate_ai_summary(self, scores_text: str, timeout: float) -> Dict[str, str]:
+        """Call Gemini for the full and short summaries (blocking)"""
+        model = self._get_model(timeout)
+        
+        # Create detailed prompt
+        prompt = f"""
 Based on the following Big Five personality trait scores, provide a comprehensive personality analysis:
 
 {scores_text}
@@ -89,30 +331,24 @@ Please provide:
 
 Format the response in clear sections with bullet points where appropriate. Be encouraging and constructive.
 """
-            
-            # Generate summary
-            response = self.model.generate_content(prompt)
-            full_summary = response.text
-            
-            # Create short summary for quick view
-            short_prompt = f"""
+        
+        # Generate summary
+        full_summary = self._generate(model, prompt, timeout)
+        
+        # Create short summary for quick view
+        short_prompt = f"""
 Based on these Big Five scores: {scores_text}
 
 Provide a 2-sentence personality snapshot that captures the essence of this personality profile.
 """
-            
-            short_response = self.model.generate_content(short_prompt)
-            short_summary = short_response.text
-            
-            return {
-                'full_summary': full_summary,
-                'short_summary': short_summary,
-                'generated_at': 'AI-generated'
-            }
-            
-        except Exception as e:
-            print(f"❌ Error generating AI summary: {e}")
-            return self._generate_fallback_summary(scores, scores_text)
+        
+        short_summary = self._generate(model, short_prompt, timeout)
+        
+        return {
+            'full_summary': full_summary,
+            'short_summary': short_summary,
+            'generated_at': 'AI-generated'
+        }
     
     def _generate_fallback_summary(self, scores: Dict[str, Dict], scores_text: str) -> Dict[str, str]:
         """Generate a rule-based summary when AI is unavailable"""
@@ -217,11 +453,7 @@ Your personality suggests you approach relationships with:
     def get_trait_specific_insights(self, trait: str, score: float) -> str:
         """Get specific insights for a single trait"""
         
-        if self.model is None:
-            return self._get_fallback_trait_insight(trait, score)
-        
-        try:
-            prompt = f"""
+        prompt = f"""
 For the personality trait {trait} with a score of {score}/10 ({score*10}%):
 
 Provide:
@@ -231,13 +463,17 @@ Provide:
 
 Keep it concise (3-4 sentences total).
 """
-            
-            response = self.model.generate_content(prompt)
-            return response.text
-            
-        except Exception as e:
-            print(f"❌ Error generating trait insight: {e}")
-            return self._get_fallback_trait_insight(trait, score)
+        
+        _, insight = self._call_with_deadline(
+            lambda: self._generate(
+                self._get_model(self.insight_timeout), prompt, self.insight_timeout
+            ),
+            self.insight_timeout
+        )
+        if insight is not None:
+            return insight
+        
+        return self._get_fallback_trait_insight(trait, score)
     
     def _get_fallback_trait_insight(self, trait: str, score: float) -> str:
         """Generate trait insight without AI"""
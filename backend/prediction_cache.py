@@ -0,0 +1,118 @@
+# backend/prediction_cache.py
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def make_prediction_key(comments: List[str], include_summary: bool) -> str:
+    """Canonical hash of a /predict request (comment list + summary flag)"""
+    payload = json.dumps(
+        {'comments': comments, 'include_summary': bool(include_summary)},
+        ensure_ascii=False,
+        separators=(',', ':'),
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PredictionCache:
+    """Single-flight coalescing plus a short-TTL result cache for /predict.
+
+    Concurrent callers with the same key share one in-flight computation,
+    and completed results are served from memory until they expire.
+    Failed computations are never cached.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 256, max_inflight: int = 64):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_inflight = max_inflight
+
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'bypassed': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    def _get_cached(self, key: str):
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._results[key]
+            return None
+
+        self._results.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: Any):
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        self._results[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached or in-flight result for key, computing it at most once"""
+        cached = self._get_cached(key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+            # Shield so one disconnecting client doesn't cancel the shared work
+            return await asyncio.shield(inflight)
+
+        self.stats['misses'] += 1
+
+        # In-flight table is full: compute without coalescing
+        if len(self._inflight) >= self.max_inflight:
+            self.stats['bypassed'] += 1
+            task = asyncio.ensure_future(compute())
+            # Not registered as in-flight, but stored and counted the same way
+            task.add_done_callback(lambda t: self._on_done(key, t))
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(compute())
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.stats['errors'] += 1
+            return
+
+        self._store(key, task.result())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters and current sizes for monitoring"""
+        return {
+            **self.stats,
+            'cached_entries': len(self._results),
+            'inflight': len(self._inflight),
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries,
+            'max_inflight': self.max_inflight
+        }
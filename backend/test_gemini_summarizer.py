@@ -0,0 +1,186 @@
+# backend/test_gemini_summarizer.py
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+# Stub out the Gemini client (and dotenv if missing) before importing the summarizer
+stub_calls = []
+stub_behavior = {'delay': 0.0, 'error': None}
+
+
+class StubModel:
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, prompt, request_options=None):
+        assert request_options and request_options.get('timeout')
+        stub_calls.append(prompt)
+        time.sleep(stub_behavior['delay'])
+        if stub_behavior['error']:
+            raise RuntimeError(stub_behavior['error'])
+        return types.SimpleNamespace(text='AI')
+
+
+genai_stub = types.ModuleType('google.generativeai')
+genai_stub.configure = lambda **kwargs: None
+genai_stub.GenerativeModel = StubModel
+google_stub = sys.modules.setdefault('google', types.ModuleType('google'))
+google_stub.generativeai = genai_stub
+sys.modules['google.generativeai'] = genai_stub
+
+try:
+    import dotenv  # noqa: F401
+except ImportError:
+    dotenv_stub = types.ModuleType('dotenv')
+    dotenv_stub.load_dotenv = lambda *args, **kwargs: None
+    sys.modules['dotenv'] = dotenv_stub
+
+from gemini_summarizer import CircuitBreaker, GeminiPersonalitySummarizer
+
+SCORES = {
+    trait: {'score': 5.0, 'percentage': 50.0}
+    for trait in ['Openness', 'Conscientiousness', 'Extraversion', 'Agreeableness', 'Neuroticism']
+}
+
+
+@pytest.fixture
+def make_summarizer(monkeypatch):
+    created = []
+
+    def factory(**env):
+        monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        summarizer = GeminiPersonalitySummarizer()
+        stub_calls.clear()
+        created.append(summarizer)
+        return summarizer
+
+    stub_behavior.update(delay=0.0, error=None)
+    stub_calls.clear()
+    yield factory
+    stub_behavior.update(delay=0.0, error=None)
+    for summarizer in created:
+        summarizer._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def run_concurrently(summarizer, count, timeout):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(summarizer.create_personality_summary(SCORES, timeout=timeout)))
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_breaker_cycle():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    for _ in range(2):
+        breaker.record_failure(breaker.allow_request())
+    assert breaker.get_state()['state'] == 'open'
+    assert breaker.allow_request() is None
+
+    time.sleep(0.06)
+    # Reported as due for a probe even before any request arrives
+    assert breaker.get_state()['state'] == 'half_open'
+
+    probe = breaker.allow_request()
+    assert probe is not None
+    assert breaker.allow_request() is None
+
+    breaker.record_success(probe)
+    assert breaker.get_state() == {'state': 'closed', 'failures': 0}
+
+
+def test_failed_probe_reopens_and_released_probe_can_retry():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.trip()
+    time.sleep(0.06)
+
+    probe = breaker.allow_request()
+    breaker.release(probe)
+    probe = breaker.allow_request()
+    assert probe is not None
+
+    breaker.record_failure(probe)
+    assert breaker.get_state()['state'] == 'open'
+    assert 'retry_in_seconds' in breaker.get_state()
+
+
+def test_stale_outcomes_do_not_change_state():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    stale = breaker.allow_request()
+    breaker.trip()
+    opened_at = breaker.opened_at
+
+    breaker.record_success(stale)
+    assert breaker.get_state()['state'] == 'open'
+
+    breaker.record_failure(stale)
+    assert breaker.opened_at == opened_at
+    assert breaker.failures == 1
+
+
+def test_queue_wait_does_not_trip_breaker(make_summarizer):
+    summarizer = make_summarizer(GEMINI_MAX_WORKERS=4)
+    stub_behavior['delay'] = 0.2
+
+    results = run_concurrently(summarizer, 12, timeout=0.5)
+    time.sleep(0.5)
+
+    assert summarizer.breaker.get_state() == {'state': 'closed', 'failures': 0}
+    assert sum(r['generated_at'] == 'AI-generated' for r in results) >= 4
+    assert summarizer.create_personality_summary(SCORES, timeout=0.5)['generated_at'] == 'AI-generated'
+
+
+def test_queued_work_is_cancelled_once_circuit_opens(make_summarizer):
+    summarizer = make_summarizer(GEMINI_MAX_WORKERS=4, GEMINI_BREAKER_RESET_SECONDS=60)
+    stub_behavior['delay'] = 0.3
+
+    results = run_concurrently(summarizer, 10, timeout=0.1)
+    time.sleep(0.5)
+
+    assert summarizer.breaker.get_state()['state'] == 'open'
+    # Only the four jobs already running reached Gemini, and none made a second call
+    assert len(stub_calls) == 4
+    summary_ids = [r['summary_id'] for r in results if 'summary_id' in r]
+    assert len(summary_ids) == 4
+    assert all(summarizer.get_pending_summary(i)['status'] == 'failed' for i in summary_ids)
+
+
+def test_pending_summary_lookup_and_eviction(make_summarizer):
+    summarizer = make_summarizer(PENDING_SUMMARY_MAX_ENTRIES=2, GEMINI_BREAKER_FAILURE_THRESHOLD=100)
+    stub_behavior['delay'] = 0.1
+
+    summary_ids = [
+        summarizer.create_personality_summary(SCORES, timeout=0.05)['summary_id']
+        for _ in range(3)
+    ]
+    assert summarizer.get_pending_summary(summary_ids[0]) is None
+    assert summarizer.get_pending_summary(summary_ids[2])['status'] == 'pending'
+    assert summarizer.get_pending_summary('unknown') is None
+
+    time.sleep(0.4)
+    result = summarizer.get_pending_summary(summary_ids[2])
+    assert result['status'] == 'complete'
+    assert result['generated_at'] == 'AI-generated'
+
+
+def test_model_load_retried_after_startup_failure(make_summarizer):
+    stub_behavior['error'] = 'unavailable'
+    summarizer = make_summarizer(GEMINI_BREAKER_RESET_SECONDS=0.05)
+    assert summarizer.model is None
+    assert summarizer.create_personality_summary(SCORES)['generated_at'] == 'Rule-based (AI unavailable)'
+
+    stub_behavior['error'] = None
+    time.sleep(0.06)
+    assert summarizer.create_personality_summary(SCORES)['generated_at'] == 'AI-generated'
+    assert summarizer.breaker.get_state()['state'] == 'closed'